@@ -0,0 +1,57 @@
+import random
+import sys
+import time
+from web import encoding
+
+"""Builds a catalog shaped like Book.get_books()"""
+def make_books(count: int):
+    books = list()
+    for book_id in range(1, count + 1):
+        books.append({"id": book_id, "title": "Book Title {}".format(book_id), "author": "Author {}".format(book_id % 97), "rating": round(random.uniform(0, 5), 2)})
+    return books
+
+"""Builds a review list shaped like Book.get_reviews()"""
+def make_reviews(count: int):
+    reviews = list()
+    for account_id in range(1, count + 1):
+        reviews.append({"account_id": account_id, "book_id": "1", "rating_score": random.randint(0, 5), "review_title": "Review {}".format(account_id), "review_text": "A review of the book, with a few sentences of text. " * 3})
+    return reviews
+
+"""Returns the average seconds taken by func over a number of runs"""
+def timed(func, runs: int):
+    #Warm up first, so the first run is not slower than the rest
+    func()
+    start = time.perf_counter()
+    for run in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs
+
+"""Prints serializer time and transfer size of every format and encoding for data"""
+def bench(name: str, data, runs: int):
+    print("{}:".format(name))
+    print("  {:<40} {:>10} {:>12} {:>10}".format("format / encoding", "bytes", "time (ms)", "vs json"))
+    json_size = len(encoding.encode(data).encode())
+    for mimetype in encoding.formats():
+        body = encoding.encode(data, mimetype)
+        if(isinstance(body, str)):
+            body = body.encode()
+        encode_time = timed(lambda: encoding.encode(data, mimetype), runs)
+        print("  {:<40} {:>10} {:>12.3f} {:>9.0f}%".format(mimetype, len(body), encode_time * 1000, 100 * len(body) / json_size))
+        #Now time compressing the serialized body
+        for content_encoding in encoding.encodings():
+            compressed = encoding.compress(body, content_encoding)
+            compress_time = timed(lambda: encoding.compress(body, content_encoding), runs)
+            label = "{} + {}".format(mimetype.split("/")[1], content_encoding)
+            print("  {:<40} {:>10} {:>12.3f} {:>9.0f}%".format(label, len(compressed), (encode_time + compress_time) * 1000, 100 * len(compressed) / json_size))
+
+"""Runs the serialization benchmark"""
+def main(args):
+    #Number of rows in each payload
+    rows = int(args[1]) if(len(args) > 1) else 1000
+    runs = 20
+    random.seed(0)
+    bench("catalog ({} books)".format(rows), make_books(rows), runs)
+    bench("reviews ({} reviews)".format(rows), make_reviews(rows), runs)
+
+if(__name__ == "__main__"):
+    main(sys.argv)
@@ -1,7 +1,11 @@
 from db.db import Database
+from db.versions import Versions
 import json
 
 class Book:
+    #Version counters for the catalog and each book's reviews, shared across instances
+    __versions = Versions()
+
     def __init__(self, book_db_path: str):
         #Connect to the book database
         self.__db = Database(book_db_path)
@@ -33,6 +37,8 @@ class Book:
             print("add_book(): failed to add book \"{}\" by \"{}\"".format(title, author))
             return False
         print("add_book(): Book was added successfully.")
+        #The catalog has changed
+        Book.__versions.bump(("catalog",))
         #Book was added
         return True
     
@@ -45,6 +51,8 @@ class Book:
 
     """Adds review to book review database"""
     def add_review(self, account_id: int, book_id: int, rating_score: float, review_title: str, review_text: str):
+        #Key the review version counter on the integer id, as the database compares it
+        review_key = ("review", int(book_id))
         #Insert review details to the review database
             #Format the parameters
         account_id = "\"{}\"".format(account_id)
@@ -62,10 +70,12 @@ class Book:
         if(not review_added):
             print("add_review(): failed to add review to book.")
             return False
+        #The book's reviews have changed
+        Book.__versions.bump(review_key)
         return True
 
-    """Gets book based on book id"""
-    def get_book(self, id: int):
+    """Gets book based on book id, as JSON unless as_json is False"""
+    def get_book(self, id: int, as_json: bool = True):
         #Check if the book exists
         book_data = self.__db.select("Book", where = "`id` = {}".format(id))
         if(len(book_data) != 0):
@@ -82,11 +92,11 @@ class Book:
                 data["title"] = title
                 data["author"] = author
             #Return the data as json
-            return json.dumps(data)
+            return json.dumps(data) if(as_json) else data
         return None
     
-    """Gets all books in database"""
-    def get_books(self):
+    """Gets all books in database, as JSON unless as_json is False"""
+    def get_books(self, as_json: bool = True):
         #Go through all books
         books = self.db().select("Book", where = "1=1")
         #Check if books have been added already
@@ -111,12 +121,12 @@ class Book:
                 #Append data index
                 data_idx += 1
             #Now convert the data dictionary to json
-            return json.dumps(data)
+            return json.dumps(data) if(as_json) else data
         #No books found
         return None
     
-    """Gets review based on account and book id"""
-    def get_review(self, account_id: int, book_id: int):
+    """Gets review based on account and book id, as JSON unless as_json is False"""
+    def get_review(self, account_id: int, book_id: int, as_json: bool = True):
         #Find all book reviews with this data
         reviews = self.__db.select("Review", where="`account_id`={} AND `book_id`={}".format(account_id, book_id))
         #Check if the review was found
@@ -135,12 +145,12 @@ class Book:
                 data["review_title"] = review_title
                 data["review_text"] = review_text
             #And return as JSON
-            return json.dumps(data)
+            return json.dumps(data) if(as_json) else data
         #Return nothing
         return None
     
-    """Gets all reviews for a book"""
-    def get_reviews(self, book_id: int):
+    """Gets all reviews for a book, as JSON unless as_json is False"""
+    def get_reviews(self, book_id: int, as_json: bool = True):
         #Find all book reviews with this data
         reviews = self.__db.select("Review", where="`book_id`={}".format(book_id))
         #Check if the review was found
@@ -167,7 +177,7 @@ class Book:
                 #Now increment the index
                 data_idx += 1
             #And return as JSON
-            return json.dumps(data)
+            return json.dumps(data) if(as_json) else data
         #Return nothing
         return None
     
@@ -179,7 +189,11 @@ class Book:
             #The book does not exist
             return False
         #Try to update the book
-        return self.__db.update("Book", ["title", "author", "rating_avg"], [title, author, rating], whereStmt="`book_id`={}".format(book_id))
+        updated = self.__db.update("Book", ["title", "author", "rating_avg"], [title, author, rating], whereStmt="`book_id`={}".format(book_id))
+        if(updated):
+            #The catalog has changed
+            Book.__versions.bump(("catalog",))
+        return updated
     
     """Updates a rating based on book and account id"""
     def update_rating(self, account_id: int, book_id: int, rating_score: int, review_title: str, review_text: str):
@@ -187,9 +201,24 @@ class Book:
         if(not self.review_exists(account_id, book_id, rating_score, review_title, review_text)):
             return False
         #Try to update the rating
-        return self.__db.update("Review", ["account_id", "book_id", "rating_score", "review_title", "review_text"],
-                                [account_id, book_id, rating_score, review_title, review_text],
-                                whereStmt="`account_id`={} AND `book_id`={}".format(account_id, book_id))
+        updated = self.__db.update("Review", ["account_id", "book_id", "rating_score", "review_title", "review_text"],
+                                   [account_id, book_id, rating_score, review_title, review_text],
+                                   whereStmt="`account_id`={} AND `book_id`={}".format(account_id, book_id))
+        if(updated):
+            #The book's reviews have changed
+            Book.__versions.bump(("review", int(book_id)))
+        return updated
+
+    """Returns the entity tag and last modified time of the book catalog"""
+    @staticmethod
+    def catalog_version():
+        return (Book.__versions.tag(("catalog",)), Book.__versions.modified(("catalog",)))
+
+    """Returns the entity tag and last modified time of a book's reviews"""
+    @staticmethod
+    def review_version(book_id: int):
+        key = ("review", int(book_id))
+        return (Book.__versions.tag(key), Book.__versions.modified(key))
 
     """Gets the database"""
     def db(self):
@@ -1,7 +1,14 @@
 import os
 import sqlite3
+import threading
+import time
 
 class Database:
+    #Query statistics for every database path, shared across instances
+    __stats_lock = threading.Lock()
+    __stats = {}
+    #When any database was last used, so maintenance can wait for idle periods
+    __last_activity = 0
 
     """Creates / opens an sqlite database"""
     def __init__(self, db_path: str):
@@ -15,6 +22,10 @@ class Database:
         try:
             self.__db = sqlite3.connect(self.__db_path)
             self.__cursor = self.__db.cursor()
+            #New databases free pages incrementally, so maintenance can reclaim space without a full vacuum
+            self.__cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            #Use a write-ahead log, so readers and writers do not block each other
+            self.__cursor.execute("PRAGMA journal_mode = WAL")
         except sqlite3.OperationalError:
             #Error encountered while connecting, possible not in existing directory
             #Get the parent directory of the database
@@ -43,7 +54,7 @@ class Database:
             else:
                 command += ")".format(key, key_types)
         #And execute it
-        create_cursor = self.__cursor.execute(command)
+        create_cursor = self.__execute(command)
         #And return if the sql code was executed
         return create_cursor != None
     
@@ -52,7 +63,7 @@ class Database:
         #Create a command for inserting values
         command = "INSERT INTO {} VALUES ({})".format(table_name, ", ".join(values))
         #Now execute it
-        insert_cursor = self.__cursor.execute(command)
+        insert_cursor = self.__execute(command, write = True)
         inserted = (insert_cursor != None)
         #And commit the changes
         self.__db.commit()
@@ -78,7 +89,7 @@ class Database:
             command += " WHERE ({})".format(whereStmt)
         
         #Now execute that command
-        update_cursor = self.__db.execute(command)
+        update_cursor = self.__execute(command, write = True)
         updated = (update_cursor != None)
 
         #And commit the changes
@@ -92,8 +103,38 @@ class Database:
         if(where != None):
             command += "WHERE ({})".format(where)
         #Now execute it and get all values
-        select_cursor = self.__cursor.execute(command)
-        return select_cursor.fetchall()
+        start = time.perf_counter()
+        rows = self.__cursor.execute(command).fetchall()
+        self.__record(time.perf_counter() - start)
+        return rows
+
+    """Executes a command and records it in the query statistics"""
+    def __execute(self, command: str, write: bool = False):
+        start = time.perf_counter()
+        cursor = self.__cursor.execute(command)
+        self.__record(time.perf_counter() - start, write)
+        return cursor
+
+    """Records a query's duration in the statistics for this database"""
+    def __record(self, seconds: float, write: bool = False):
+        with Database.__stats_lock:
+            Database.__last_activity = time.time()
+            stats = Database.__stats.setdefault(os.path.abspath(self.__db_path), {"queries": 0, "query_seconds": 0.0, "writes": 0})
+            stats["queries"] += 1
+            stats["query_seconds"] += seconds
+            if(write):
+                stats["writes"] += 1
+
+    """Returns a copy of the query statistics recorded for a database path"""
+    @staticmethod
+    def stats(db_path: str):
+        with Database.__stats_lock:
+            return dict(Database.__stats.get(os.path.abspath(db_path), {"queries": 0, "query_seconds": 0.0, "writes": 0}))
+
+    """Returns how many seconds have passed since any database was last used"""
+    @staticmethod
+    def idle_time():
+        return time.time() - Database.__last_activity
     
     """Commits changes to database and closes connections to it"""
     def close(self):
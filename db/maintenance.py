@@ -0,0 +1,193 @@
+import collections
+import os
+import sqlite3
+import threading
+import time
+from db.db import Database
+
+class Maintenance(threading.Thread):
+
+    """Creates a background scheduler that keeps the given databases maintained"""
+    def __init__(self, db_paths: list, analyze_interval: float = 3600, analyze_writes: int = 500,
+                 vacuum_interval: float = 3600, vacuum_free_pages: int = 256, vacuum_pages: int = 128,
+                 convert_auto_vacuum: bool = False, convert_max_pages: int = 10000,
+                 checkpoint_interval: float = 300, checkpoint_pages: int = 1000,
+                 idle_seconds: float = 2, poll_seconds: float = 5, history_size: int = 100):
+        #Run as a daemon, so the scheduler never keeps the server process alive
+        super().__init__(name = "Maintenance", daemon = True)
+        self.__db_paths = db_paths
+        #Statistics are collected every interval, or after this many writes
+        self.__analyze_interval = analyze_interval
+        self.__analyze_writes = analyze_writes
+        #Space is reclaimed every interval, or once this many pages are free, a few pages at a time
+        self.__vacuum_interval = vacuum_interval
+        self.__vacuum_free_pages = vacuum_free_pages
+        self.__vacuum_pages = vacuum_pages
+        #Switching a database to incremental auto vacuum takes a full, exclusive vacuum,
+        #so it only happens when asked for, and only on databases up to this many pages
+        self.__convert_auto_vacuum = convert_auto_vacuum
+        self.__convert_max_pages = convert_max_pages
+        #Databases already told they are not being converted, so the log is not repeated
+        self.__conversion_skipped = set()
+        #The WAL is checkpointed every interval, or once it grows past this many pages
+        self.__checkpoint_interval = checkpoint_interval
+        self.__checkpoint_pages = checkpoint_pages
+        #Only run once the databases have been idle this long, and check this often
+        self.__idle_seconds = idle_seconds
+        self.__poll_seconds = poll_seconds
+        #When each task last ran on each database, and the write count it last saw
+        self.__last_run = {}
+        self.__last_writes = {}
+        #Query statistics at the previous record for each database
+        self.__last_stats = {}
+        #Timing and pages freed of recent maintenance runs
+        self.__history_lock = threading.Lock()
+        self.__history = collections.deque(maxlen = history_size)
+        self.__stopped = threading.Event()
+
+    """Runs maintenance tasks until stopped"""
+    def run(self):
+        while(not self.__stopped.wait(self.__poll_seconds)):
+            for db_path in self.__db_paths:
+                #The database may not have been created yet
+                if(not os.path.exists(db_path)):
+                    continue
+                for task in ["analyze", "vacuum", "checkpoint"]:
+                    #Yield to foreground traffic
+                    if(Database.idle_time() < self.__idle_seconds):
+                        break
+                    self.__run_task(db_path, task)
+
+    """Stops the scheduler"""
+    def stop(self):
+        self.__stopped.set()
+
+    """Returns the records of recent maintenance runs"""
+    def history(self):
+        with self.__history_lock:
+            return list(self.__history)
+
+    """Returns if a task is due for a database, given its interval"""
+    def __interval_elapsed(self, db_path: str, task: str, interval: float):
+        return (time.time() - self.__last_run.get((db_path, task), 0)) >= interval
+
+    """Reads the page size and number of free pages from a database file's header"""
+    def __header(self, db_path: str):
+        with open(db_path, "rb") as file:
+            header = file.read(100)
+        #Check if the database is still empty
+        if(len(header) < 100):
+            return (4096, 0)
+        #A page size of 1 means 65536 bytes
+        page_size = int.from_bytes(header[16:18], "big")
+        page_size = 65536 if(page_size == 1) else page_size
+        return (page_size, int.from_bytes(header[36:40], "big"))
+
+    """Returns if a task is due for a database, without opening a connection to it"""
+    def __due(self, db_path: str, task: str):
+        if(task == "analyze"):
+            #Check if enough time or writes have passed since the last run
+            writes = Database.stats(db_path)["writes"] - self.__last_writes.get(db_path, 0)
+            return self.__interval_elapsed(db_path, task, self.__analyze_interval) or (writes >= self.__analyze_writes)
+        page_size, free_pages = self.__header(db_path)
+        if(task == "vacuum"):
+            #Databases that were not converted never free pages
+            if(db_path in self.__conversion_skipped):
+                return False
+            #Check if there is enough free space, or it has been long enough since the last run
+            return (free_pages >= self.__vacuum_free_pages) or self.__interval_elapsed(db_path, task, self.__vacuum_interval)
+        #Databases not in WAL mode have no log to checkpoint
+        wal_path = "{}-wal".format(db_path)
+        if(not os.path.exists(wal_path)):
+            return False
+        #The log keeps its size after a checkpoint, so only check it if it was written since the last one
+        if(os.path.getmtime(wal_path) <= self.__last_run.get((db_path, task), 0)):
+            return False
+        #Check if the log is large enough, or it has been long enough since the last run
+        return ((os.path.getsize(wal_path) / page_size) >= self.__checkpoint_pages) or self.__interval_elapsed(db_path, task, self.__checkpoint_interval)
+
+    """Runs a task on a database if it is due, and records it"""
+    def __run_task(self, db_path: str, task: str):
+        #Only connect when there is something to do
+        if(not self.__due(db_path, task)):
+            return
+        try:
+            #Never wait on locks held by foreground connections, just try again later
+            connection = sqlite3.connect(db_path, timeout = 0)
+        except sqlite3.OperationalError as e:
+            print("Maintenance(): could not open \"{}\": {}".format(db_path, e))
+            return
+        try:
+            start = time.perf_counter()
+            if(task == "analyze"):
+                pages_freed = self.__analyze(connection, db_path)
+            elif(task == "vacuum"):
+                pages_freed = self.__vacuum(connection, db_path)
+            else:
+                pages_freed = self.__checkpoint(connection, db_path)
+            self.__last_run[(db_path, task)] = time.time()
+            #Check if the task had nothing to do
+            if(pages_freed == None):
+                return
+            self.__record(db_path, task, time.perf_counter() - start, pages_freed)
+        except sqlite3.OperationalError as e:
+            #Database is busy, leave the task due so it runs on a later poll
+            print("Maintenance(): {} on \"{}\" deferred: {}".format(task, db_path, e))
+        finally:
+            connection.close()
+
+    """Collects planner statistics"""
+    def __analyze(self, connection, db_path: str):
+        writes = Database.stats(db_path)["writes"]
+        #Bound the rows examined per index, so this stays quick on large tables
+        connection.execute("PRAGMA analysis_limit = 1000")
+        connection.execute("ANALYZE")
+        connection.execute("PRAGMA optimize")
+        connection.commit()
+        self.__last_writes[db_path] = writes
+        return 0
+
+    """Reclaims free pages, returns the number of pages freed or None if there were none"""
+    def __vacuum(self, connection, db_path: str):
+        #Check if there is no free space to reclaim
+        if(connection.execute("PRAGMA freelist_count").fetchone()[0] == 0):
+            return None
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        #Check if the database can be vacuumed incrementally
+        if(connection.execute("PRAGMA auto_vacuum").fetchone()[0] != 2):
+            #Check if the one time conversion was not asked for, or the database is too large to lock while it runs
+            if(not self.__convert_auto_vacuum or page_count > self.__convert_max_pages):
+                if(db_path not in self.__conversion_skipped):
+                    self.__conversion_skipped.add(db_path)
+                    reason = "convert_auto_vacuum is off" if(not self.__convert_auto_vacuum) else "it has {} pages, over the limit of {}".format(page_count, self.__convert_max_pages)
+                    print("Maintenance(): skipped switching \"{}\" to incremental vacuum, {}".format(db_path, reason))
+                return None
+            #Switch to incremental auto vacuum, which takes one full vacuum
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("VACUUM")
+        else:
+            #Free a few pages at a time, so foreground writes are not held up for long
+            #executescript steps the pragma to completion, execute would only free one page
+            connection.executescript("PRAGMA incremental_vacuum({})".format(self.__vacuum_pages))
+        return page_count - connection.execute("PRAGMA page_count").fetchone()[0]
+
+    """Checkpoints the write-ahead log, returns the pages checkpointed"""
+    def __checkpoint(self, connection, db_path: str):
+        #A passive checkpoint never waits on readers or writers
+        busy, log_pages, checkpointed = connection.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return max(checkpointed, 0)
+
+    """Records a maintenance run along with the query latency leading up to it"""
+    def __record(self, db_path: str, task: str, seconds: float, pages_freed: int):
+        #Average query latency since the previous record for this database
+        stats = Database.stats(db_path)
+        last_stats = self.__last_stats.get(db_path, {"queries": 0, "query_seconds": 0.0})
+        queries = stats["queries"] - last_stats["queries"]
+        query_ms = ((stats["query_seconds"] - last_stats["query_seconds"]) * 1000 / queries) if(queries > 0) else None
+        self.__last_stats[db_path] = stats
+        #Checkpoints copy pages back into the database rather than freeing them
+        pages_key = "pages_checkpointed" if(task == "checkpoint") else "pages_freed"
+        record = {"database": db_path, "task": task, "time": time.time(), "seconds": seconds, pages_key: pages_freed, "query_ms": query_ms}
+        with self.__history_lock:
+            self.__history.append(record)
+        print("Maintenance(): {} on \"{}\" took {:.3f}s, {} {}".format(task, db_path, seconds, pages_key.replace("_", " "), pages_freed))
@@ -0,0 +1,37 @@
+import threading
+import time
+
+class Versions:
+
+    """Creates a set of version counters, shared by everything holding this instance"""
+    def __init__(self):
+        #Counters are bumped by request threads, so guard them with a lock
+        self.__lock = threading.Lock()
+        #Maps a key to its (version, last modified time)
+        self.__versions = {}
+        #Versions restart at zero with the process, so tag them with the start time
+        self.__boot = int(time.time())
+
+    """Bumps the version counter associated with key"""
+    def bump(self, key):
+        with self.__lock:
+            version = self.__versions.get(key, (0, self.__boot))[0]
+            self.__versions[key] = (version + 1, time.time())
+
+    """Returns the (version, last modified time) associated with key"""
+    def get(self, key):
+        with self.__lock:
+            return self.__versions.get(key, (0, self.__boot))
+
+    """Returns an entity tag built from the given keys and their version counters"""
+    def tag(self, *keys):
+        #Start with the process start time, so restarts never reuse a tag
+        tag = "{}".format(self.__boot)
+        for key in keys:
+            #Keys are tuples such as ("review", book_id)
+            tag += "-{}.{}".format(".".join([str(part) for part in key]), self.get(key)[0])
+        return tag
+
+    """Returns the latest modified time of the given keys"""
+    def modified(self, *keys):
+        return max([self.get(key)[1] for key in keys])
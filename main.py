@@ -1,11 +1,16 @@
 from user.user import User
 from book.book import Book
-from flask import request, redirect, session
+from flask import request, redirect, session, abort
 from web.wrapper import Wrapper
+from db.maintenance import Maintenance
+import json
 import sys
 
 #Create a server wrapper to allow interacting with database
 server = Wrapper(__name__)
+#And a scheduler to keep the databases analyzed, checkpointed, and vacuumed
+#Existing databases are switched to incremental vacuum once, while they are small enough to do so quickly
+maintenance = Maintenance(["resources/database/accounts.db", "resources/database/books.db"], convert_auto_vacuum = True)
 
 """The main registration page"""
 def registration_page():
@@ -108,13 +113,18 @@ def read_css_data():
 
 """Non-page, returns string containing user's wishlist"""
 def read_wishlist():
-    #Create / open accounts database
-    users = User("resources/database/accounts.db")
-    #Now check if the user has signed in
+    #Check if the user has signed in
     if(session != None):
         try:
             if(session["user_email"] != None):
-                #User has signed in, return the wishlist
+                #User has signed in, check if their copy of the wishlist is current
+                tag, modified = User.wishlist_version(session["user_id"])
+                cached = server.not_modified(tag, modified)
+                if(cached != None):
+                    return cached
+                #Create / open accounts database
+                users = User("resources/database/accounts.db")
+                #Return the wishlist
                 data = ""
                 wishlist = users.get_wishlist(session["user_id"])
                 #Convert the wishlist into a comma-separated string
@@ -125,15 +135,22 @@ def read_wishlist():
                             data += "{}, ".format(id)
                         else:
                             data += "{}".format(id)
+                #Close the database
+                users.close()
                 #And return it
-                return data
+                return server.versioned(data, tag, modified)
         except KeyError:
             pass
-    #Close the database
-    users.close()
     #Redirect to main page
     return redirect("/")
 
+"""Returns an integer id from the request's arguments, or aborts with 400 if it is not one"""
+def read_id(name: str):
+    try:
+        return int(request.args[name])
+    except ValueError:
+        abort(400)
+
 """Returns if a user is signed in"""
 def is_signed_in():
     #Check if a session has been initialized
@@ -150,8 +167,6 @@ def is_signed_in():
 
 """Non-page, gets book data based on id. If id < 0, it returns a list of books."""
 def get_books():
-    #Create / open books database
-    books = Book("resources/database/books.db")
     response = "No book found";
 
     #Check if user has not signed in
@@ -168,13 +183,22 @@ def get_books():
             #Check if book id is 0
             if(book_id == 0):
                 book_id += 1
+            #Check if the client's copy of the catalog is current
+            tag, modified = Book.catalog_version()
+            tag = server.format_tag(tag)
+            cached = server.not_modified(tag, modified)
+            if(cached != None):
+                return cached
+            #Create / open books database
+            books = Book("resources/database/books.db")
             #Check if book id is valid
             if(book_id >= 1):
                 #Return the book's information
-                response = str(books.get_book(book_id))
+                response = server.encode(books.get_book(book_id, as_json = False))
             else:
                 #Return a list of all books
-                response = str(books.get_books())
+                response = server.encode(books.get_books(as_json = False))
+            return server.versioned(response, tag, modified)
     return response
 
 """The books page, full of all books"""
@@ -233,7 +257,7 @@ def add_page():
     #Check if we are adding a book to our wishlist
     elif(add_type == "wishlist"):
         #Get the book and account ID
-        book_id = request.args["book_id"]
+        book_id = read_id("book_id")
         account_id = session["user_id"]
 
         book_id = str(book_id)
@@ -248,7 +272,7 @@ def add_page():
     #Check if we should add a review
     elif(add_type == "review"):
         account_id = session["user_id"]
-        book_id = request.args["book_id"]
+        book_id = read_id("book_id")
         review_title = request.form["review_title"]
         review_text = request.form["review_text"]
         rating = request.form["rating"]
@@ -265,29 +289,45 @@ def get_page():
     #Type to get (single review, all reviews)
     type_get = request.args["type"]
     #Gets all review data associated with book id
-    book_id = request.args["book_id"]
+    book_id = read_id("book_id")
+    #Check if the client's copy of the reviews is current
+    tag, modified = Book.review_version(book_id)
+    if(type_get == "user"):
+        #A user's review differs per account
+        tag += "-user.{}".format(session["user_id"])
+    tag = server.format_tag(tag)
+    cached = server.not_modified(tag, modified)
+    if(cached != None):
+        return cached
     #Create / open books database
     books = Book("resources/database/books.db")
     #Check if we should get a user's review
     if(type_get == "user"):
         #And get all reviews associated with book id and user
-        return str(books.get_review(session["user_id"], book_id))
+        return server.versioned(server.encode(books.get_review(session["user_id"], book_id, as_json = False)), tag, modified)
     elif(type_get == "all"):
         #Get all reviews associated with book
-        return str(books.get_reviews(book_id))
+        return server.versioned(server.encode(books.get_reviews(book_id, as_json = False)), tag, modified)
 
+"""Non-page, returns recent database maintenance runs as JSON"""
+def maintenance_page():
+    #Check if user has not signed in
+    if(not is_signed_in()):
+        #Not signed in, redirect to index
+        return redirect("/")
+    return json.dumps(maintenance.history())
 
 """The main program"""
 def main(server: Wrapper, args):
     #Add the main pages to our wrapper
         #Add the wishlist page
-    server.add_route("/wishlist", read_wishlist)
+    server.add_route("/wishlist", read_wishlist, batch = True)
         #And the book and review adding page
     server.add_route("/add", add_page)
         #And the review getting page, for API
-    server.add_route("/get", get_page)
+    server.add_route("/get", get_page, batch = True)
         #And the book page
-    server.add_route("/book", get_books)
+    server.add_route("/book", get_books, batch = True)
         #And the books page
     server.add_route("/books", books_page)
         #Now add a logoff page
@@ -300,12 +340,16 @@ def main(server: Wrapper, args):
     server.add_route("/dashboard", dashboard_page)
         #Now add the description page
     server.add_route("/description", description_page)
+        #And the database maintenance page
+    server.add_route("/maintenance", maintenance_page)
         #And the index page
     server.add_route("/", index_page)
     server.add_route("/index", index_page)
         #Now add all css and js files
     server.add_all("resources/web", ".css", read_css_data)
     server.add_all("resources/web", ".js", read_css_data)
+    #Start maintaining the databases in the background
+    maintenance.start()
     #Run the server
     server.run()
 if(__name__ == "__main__"):
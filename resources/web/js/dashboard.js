@@ -23,16 +23,77 @@ function read(url, parameters = null)
     return requestText
 }
 
-//Gets the wishlist
-function getWishList(limit = 25)
+//Returns the stored ETag and body of a url read through readBatch, or null
+function readCached(url)
+{
+    return JSON.parse(sessionStorage.getItem("batch:" + url));
+}
+
+//Reads content from several urls in one request, resolves to their responses in order
+async function readBatch(urls)
+{
+    var subRequests = [];
+    var responses = [];
+
+    //Send the ETag of each url's stored response, so unchanged urls come back as 304
+    for(var index = 0; index < urls.length; index++)
+    {
+        var cached = readCached(urls[index]);
+        var headers = {};
+        if(cached != null)
+            headers["If-None-Match"] = cached["etag"];
+        subRequests.push({"url": urls[index], "headers": headers});
+        //Responses are empty if they fail, like read()
+        responses.push("");
+    }
+
+    //Try to send the batch
+    try
+    {
+        const response = await fetch("/batch", {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify(subRequests)
+        });
+        if(response.ok)
+        {
+            //Get each url's response
+            var results = await response.json();
+            for(var index = 0; index < results.length; index++)
+            {
+                var result = results[index];
+                var cached = readCached(urls[index]);
+                if((result["status"] == 304) && (cached != null))
+                {
+                    //Unchanged, reuse the stored body
+                    responses[index] = cached["body"];
+                }
+                else if(result["status"] == 200)
+                {
+                    responses[index] = result["body"];
+                    //Store the body along with its ETag for the next read
+                    if(result["headers"]["ETag"] != undefined)
+                        sessionStorage.setItem("batch:" + urls[index], JSON.stringify({"etag": result["headers"]["ETag"], "body": result["body"]}));
+                }
+            }
+        }
+    } catch (e)
+    {
+        console.log("readBatch(): failed to read batch.");
+    }
+
+    //Return the responses
+    return responses;
+}
+
+//Gets the wishlist, given the wishlist page's data
+async function getWishList(wishListIds, limit = 25)
 {
     //Look for the wishlist
     var wishList = document.getElementById("wishlist");
     //Make sure wishlist is set
     if(wishList != null)
     {
-        //Get data from wishlist page
-        let wishListIds = read("/wishlist");
         //Check if the limit is < 0
         if(limit < 0)
             //Set limit to length of wishlist ids list
@@ -40,11 +101,19 @@ function getWishList(limit = 25)
         //Split the wishlist by comma
         wishListIds = wishListIds.split(", ")
         
-        //Now, create a list of books
+        //Get all wishlisted books' titles and authors in one request
+        var urls = [];
         for(let idIndex = 0; (idIndex < wishListIds.length) && (idIndex < limit); idIndex++)
+        {
+            urls.push("/book?id="+wishListIds[idIndex]);
+        }
+        var booksData = await readBatch(urls);
+
+        //Now, create a list of books
+        for(let idIndex = 0; idIndex < booksData.length; idIndex++)
         {
             //Get the wishlisted book's title and author
-            var bookData = read("/book?id="+wishListIds[idIndex]);
+            var bookData = booksData[idIndex];
     
             //Check if the wishlist list is set
             if(wishList != null)
@@ -57,18 +126,18 @@ function getWishList(limit = 25)
     }
 }
 
-//Gets the books
-function getBooks(limit = 25)
+//Gets the books, given the list of all books
+function getBooks(books, limit = 25)
 {
     //Look for books list
     var booksList = document.getElementById("books");
-    //Get all books
-    var books = read("/book?id=-1");
-    books = JSON.parse(books);
 
     //Check if books list is set
     if(booksList != null)
     {
+        //Get all books
+        books = JSON.parse(books);
+
         //Go through all books within limit
         for(var index = 0; (index < books.length) && (index < limit); index++)
         {
@@ -82,8 +151,24 @@ function getBooks(limit = 25)
 //On load, initialize the wishlist and books list
 document.onload = new function()
 {
+    //Read the lists this page shows in one request
+    var hasWishList = (document.getElementById("wishlist") != null);
+    var hasBooks = (document.getElementById("books") != null);
+    var urls = [];
+    if(hasWishList)
+        urls.push("/wishlist");
+    if(hasBooks)
+        urls.push("/book?id=-1");
 
-    //Page is loaded, get the wishlist
-    getWishList();
-    getBooks();
+    //Page is loaded, show the lists once they are read
+    if(urls.length != 0)
+    {
+        readBatch(urls).then(function(responses)
+        {
+            if(hasWishList)
+                getWishList(responses.shift());
+            if(hasBooks)
+                getBooks(responses.shift());
+        });
+    }
 };
\ No newline at end of file
@@ -74,16 +74,31 @@ function updateRating()
     }
 }
 
-//Shows all reviews
-function showReviews()
+//Shows the book's title and author, given the book's data
+function showBook(bookData)
+{
+    //Get the book data elements
+    var title = document.getElementById("title");
+    var author = document.getElementById("author");
+    if((title != null) && (author != null))
+    {
+        //Convert the book's details to JSON
+        var book = JSON.parse(bookData);
+        //And show them
+        title.textContent = book["title"];
+        author.textContent = "By " + book["author"];
+    }
+}
+
+//Shows all reviews, given all of the book's reviews
+function showReviews(reviewsData)
 {
     //Get all reviews
-    var book_id = get("book_id");
     var reviewsView = document.getElementById("reviews");
     if(reviewsView != null)
     {
         //Read all reviews
-        var reviews = JSON.parse(read("/get?type=all&book_id=" + book_id));
+        var reviews = JSON.parse(reviewsData);
         console.log(reviews);
         //Show all reviews
         for(var index = 0; index < reviews.length; index++)
@@ -101,17 +116,16 @@ function showReviews()
     }
 }
 
-//Show average rating for a book
-function showAverageRating()
+//Show average rating for a book, given all of its reviews
+function showAverageRating(reviewsData)
 {
     //Get all reviews
-    var bookId = get("book_id");
     var avgRating = document.getElementById("avg_rating");
     var average = 0
     if(avgRating != null)
     {
         //Get all reviews with associated book id
-        var reviews = JSON.parse(read("/get?type=all&book_id=" + bookId));
+        var reviews = JSON.parse(reviewsData);
         //Determine the average rating
         for(var index = 0; index < reviews.length; index++)
         {
@@ -129,16 +143,15 @@ function showAverageRating()
     }
 }
 
-//Show your rating
-function showYourRating()
+//Show your rating, given your review
+function showYourRating(reviewData)
 {
     //Show your rating
-    var bookId = get("book_id");
     var yourRating = document.getElementById("your_rating");
     if(yourRating != null)
     {
         //Get user's review
-        var review = JSON.parse(read("/get?type=user&book_id=" + bookId));
+        var review = JSON.parse(reviewData);
         var rating = ((review["rating_score"]) / 5) * 100;
         //And get the rating score
         yourRating.innerText = "Your Rating: " + rating + "%";
@@ -163,13 +176,16 @@ function makeATWFunctional()
 //Start updating rating
 updateRating();
 
-//And show the reviews
-showReviews();
-
 window.onload = function()
 {
-    showReviews();
-    showAverageRating();
-    showYourRating();
+    //Read the book, all reviews and your review in one request, and show them once read
+    var bookId = get("book_id");
+    readBatch(["/book?id=" + bookId, "/get?type=all&book_id=" + bookId, "/get?type=user&book_id=" + bookId]).then(function(responses)
+    {
+        showBook(responses[0]);
+        showReviews(responses[1]);
+        showAverageRating(responses[1]);
+        showYourRating(responses[2]);
+    });
     makeATWFunctional();
 }
\ No newline at end of file
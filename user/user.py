@@ -1,7 +1,11 @@
 import hashlib
 from db.db import Database
+from db.versions import Versions
 
 class User:
+    #Version counters for each user's wishlist, shared across instances
+    __versions = Versions()
+
     def __init__(self, account_db_path: str):
         #Create a connection to our account database
         self.__db = Database(account_db_path)
@@ -59,6 +63,9 @@ class User:
         inserted = self.__db.insert("Wishlist", [account_id, book_id])
         if(not inserted):
             print("add_wishlist(): could not add book to wishlist.")
+        else:
+            #The user's wishlist has changed
+            User.__versions.bump(("wishlist", int(account_id)))
         return inserted
 
     """Get wishlist"""
@@ -66,6 +73,12 @@ class User:
         #Look for account id in wishlist database
         return self.__db.select("Wishlist", select_keys=["`book_id`"] , where="`account_id`={}".format(account_id))
 
+    """Returns the entity tag and last modified time of a user's wishlist"""
+    @staticmethod
+    def wishlist_version(account_id: int):
+        key = ("wishlist", int(account_id))
+        return (User.__versions.tag(key), User.__versions.modified(key))
+
     """Closes the database"""
     def close(self):
         #Close the database
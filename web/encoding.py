@@ -0,0 +1,62 @@
+import gzip
+import json
+
+#MessagePack and zstd are optional, only offer them when they are installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#Mimetypes of the response formats the API can return
+JSON_MIMETYPE = "application/json"
+COLUMNS_MIMETYPE = "application/vnd.bookslist.columns+json"
+MSGPACK_MIMETYPE = "application/x-msgpack"
+
+"""Returns the response formats available, in order of preference"""
+def formats():
+    available = [JSON_MIMETYPE, COLUMNS_MIMETYPE]
+    if(msgpack != None):
+        available.append(MSGPACK_MIMETYPE)
+    return available
+
+"""Returns the content encodings available, in order of preference"""
+def encodings():
+    available = ["gzip"]
+    if(zstandard != None):
+        available.insert(0, "zstd")
+    return available
+
+"""Converts a list of dictionaries into a dictionary of columns"""
+def columns(data):
+    #Only lists of rows can be packed into columns
+    if(not isinstance(data, list) or len(data) == 0):
+        return data
+    #Use the keys of the first row as the column names
+    packed = dict()
+    for key in data[0]:
+        packed[key] = [row[key] for row in data]
+    return packed
+
+"""Serializes data into the given format"""
+def encode(data, mimetype: str = JSON_MIMETYPE):
+    if(mimetype == COLUMNS_MIMETYPE):
+        #Pack rows into columns, so keys are only sent once
+        return json.dumps(columns(data), separators=(",", ":"))
+    elif(mimetype == MSGPACK_MIMETYPE):
+        #Binary MessagePack encoding
+        return msgpack.packb(data)
+    #Plain JSON, as the API has always returned
+    return str(json.dumps(data)) if(data != None) else "None"
+
+"""Compresses a body using the given content encoding"""
+def compress(body: bytes, encoding: str):
+    if(encoding == "zstd"):
+        return zstandard.ZstdCompressor().compress(body)
+    elif(encoding == "gzip"):
+        #A middle compression level, higher levels cost CPU for very little size
+        return gzip.compress(body, compresslevel = 6)
+    return body
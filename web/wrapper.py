@@ -1,15 +1,33 @@
 import os
-from flask import Flask
+import json
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, session, make_response
+from flask.ctx import RequestContext
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from web import encoding
 
 class Wrapper:
-    def __init__(self, name):
+    def __init__(self, name, compress_threshold: int = 1024, batch_workers: int = 8, batch_limit: int = 32):
         self.__app = Flask(name)
         self.__app.secret_key = "BooksListSecretKey"
         self.__routes = {}
+        #Read-only routes that may be run as part of a batch
+        self.__batch_routes = {}
+        #Responses smaller than this many bytes are sent uncompressed
+        self.__compress_threshold = compress_threshold
+        #Compress every response the client accepts compressed
+        self.__app.after_request(self.__compress)
+        #Batched sub-requests share a bounded pool of threads, and batches are limited in size
+        self.__batch_pool = ThreadPoolExecutor(max_workers = batch_workers, thread_name_prefix = "Batch")
+        self.__batch_limit = batch_limit
+        self.__app.add_url_rule("/batch", endpoint = "batch", methods = ["post"], view_func = self.__batch)
     
-    """Assigns a function to a given route"""
-    def add_route(self, route, func):
+    """Assigns a function to a given route, allowing it in batches if it is read-only"""
+    def add_route(self, route, func, batch: bool = False):
         self.__routes[route] = func
+        if(batch):
+            self.__batch_routes[route] = func
         self.__app.add_url_rule(route, methods=["post", "get"], view_func=func)
     
     """Runs the flask web server"""
@@ -42,6 +60,112 @@ class Wrapper:
             #Read the lines from the file
             return file.readlines()
 
+    """Returns a 304 response if the client already holds the given version, otherwise None"""
+    def not_modified(self, tag: str, modified: float):
+        #Check the client's If-None-Match header against our entity tag, and its compressed variants
+        tags = [tag] + ["{}-{}".format(tag, content_encoding) for content_encoding in encoding.encodings()]
+        for current_tag in tags:
+            if(request.if_none_match.contains(current_tag)):
+                return self.versioned(("", 304), current_tag, modified)
+        return None
+
+    """Attaches ETag and Last-Modified headers for the given version to a response"""
+    def versioned(self, response, tag: str, modified: float):
+        response = make_response(response)
+        response.set_etag(tag)
+        response.last_modified = modified
+        #Make clients revalidate every time, so repeat requests send If-None-Match
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    """Returns the response format the client asked for in its Accept header"""
+    def __format(self):
+        #Clients that accept anything get plain JSON
+        return request.accept_mimetypes.best_match(encoding.formats(), default = encoding.JSON_MIMETYPE)
+
+    """Returns an entity tag that also identifies the response format the client asked for"""
+    def format_tag(self, tag: str):
+        mimetype = self.__format()
+        if(mimetype != encoding.JSON_MIMETYPE):
+            tag += "-{}".format(mimetype.split("/")[1])
+        return tag
+
+    """Serializes data into the response format the client asked for"""
+    def encode(self, data):
+        mimetype = self.__format()
+        response = make_response(encoding.encode(data, mimetype))
+        #Plain JSON is sent as the same text response the API always returned
+        if(mimetype != encoding.JSON_MIMETYPE):
+            response.mimetype = mimetype
+        response.vary.add("Accept")
+        return response
+
+    """Compresses a response if the client accepts it and it is large enough"""
+    def __compress(self, response):
+        #Only compress complete, successful responses that are not already encoded
+        if(response.status_code != 200 or response.direct_passthrough or response.is_streamed or ("Content-Encoding" in response.headers)):
+            return response
+        response.vary.add("Accept-Encoding")
+        #Small responses are not worth the CPU time
+        body = response.get_data()
+        if(len(body) < self.__compress_threshold):
+            return response
+        #Pick the best encoding the client accepts
+        content_encoding = request.accept_encodings.best_match(encoding.encodings())
+        if(content_encoding == None):
+            return response
+        response.set_data(encoding.compress(body, content_encoding))
+        response.headers["Content-Encoding"] = content_encoding
+        #A compressed body is a different representation, so give it its own tag
+        tag, weak = response.get_etag()
+        if(tag != None):
+            response.set_etag("{}-{}".format(tag, content_encoding), weak)
+        return response
+
+    """Runs a list of sub-requests concurrently, returning all of their results as JSON"""
+    def __batch(self):
+        #Sub-requests are sent as a JSON list of urls, or of {"url": ..., "headers": {...}}
+        #Requiring a JSON content type keeps cross-site forms from posting batches without a preflight
+        if(not request.is_json):
+            return make_response(("Expected an application/json request", 415))
+        sub_requests = request.get_json(silent = True)
+        if(not isinstance(sub_requests, list) or len(sub_requests) > self.__batch_limit):
+            return make_response(("Expected a JSON list of at most {} requests".format(self.__batch_limit), 400))
+        #Every sub-request shares the caller's session
+        caller_session = session._get_current_object()
+        futures = [self.__batch_pool.submit(self.__dispatch, sub_request, caller_session) for sub_request in sub_requests]
+        #Results are returned in the order they were requested
+        response = make_response(json.dumps([future.result() for future in futures]))
+        response.mimetype = encoding.JSON_MIMETYPE
+        return response
+
+    """Runs a single sub-request of a batch through its route's function"""
+    def __dispatch(self, sub_request, caller_session):
+        #Check if the sub-request is just a url
+        if(not isinstance(sub_request, dict)):
+            sub_request = {"url": sub_request}
+        url = str(sub_request.get("url", ""))
+        headers = sub_request.get("headers", {})
+        #Only dispatch to read-only routes that were allowed in batches
+        func = self.__batch_routes.get(url.split("?")[0])
+        if(func == None or not isinstance(headers, dict)):
+            return {"url": url, "status": 404, "headers": {}, "body": ""}
+        #Only forward If-None-Match, so sub-requests always get text JSON rather than another format
+        headers = {"If-None-Match": str(headers["If-None-Match"])} if("If-None-Match" in headers) else {}
+        try:
+            #Build a request for the sub-request, using the caller's session
+            environ = EnvironBuilder(path = url, method = "GET", headers = headers).get_environ()
+            context = RequestContext(self.__app, environ, session = caller_session)
+            with context:
+                response = self.__app.make_response(func())
+                return {"url": url, "status": response.status_code, "headers": dict(response.headers), "body": response.get_data(as_text = True)}
+        except HTTPException as e:
+            #Such as a missing query parameter
+            return {"url": url, "status": e.code, "headers": {}, "body": ""}
+        except Exception as e:
+            print("batch(): \"{}\" failed: {}".format(url, e))
+            return {"url": url, "status": 500, "headers": {}, "body": ""}
+
     """Returns the flask instance"""
     def app(self):
         return self.__app
\ No newline at end of file